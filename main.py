@@ -1,78 +1,191 @@
 import os
+import io
+import asyncio
+import atexit
 import logging
+import queue
 import time
 import re
+import tempfile
+from collections import defaultdict
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
 from urllib.request import urlretrieve
 from telethon.sync import TelegramClient, events
 from telethon.sessions import StringSession
-from tweepy import Client as TwitterClient
-from tweepy.errors import TweepyException
+from tweepy import Client as TwitterClient, OAuth1UserHandler, API
+from tweepy.errors import TweepyException, TooManyRequests
 
-# Configure logging
+# Configure logging; records are written by a background listener thread
+# so file and console I/O never block the event loop
+_log_queue = queue.Queue(-1)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('smart_posting_bot.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[QueueHandler(_log_queue)]
 )
+_log_listener = QueueListener(
+    _log_queue,
+    logging.FileHandler('smart_posting_bot.log'),
+    logging.StreamHandler()
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
+# Media below this size is kept in memory instead of written to disk
+IN_MEMORY_MEDIA_LIMIT = 10 * 1024 * 1024
+
+# Twitter rejects media uploads above this size
+TWITTER_MEDIA_LIMIT = 50 * 1024 * 1024
+
+# Album items are reposted as one album once no new item has arrived
+# for this long
+ALBUM_DEBOUNCE_SECONDS = 0.5
+
+# Port for the HTTP health check endpoint
+HEALTH_CHECK_PORT = 8000
+HEALTH_CHECK_TIMEOUT = 5
+
+# Retry policy for Twitter rate limit (429) responses
+TWITTER_MAX_RETRIES = 3
+TWITTER_RETRY_BASE_DELAY = 5
+
+# Text cleanup patterns, compiled once at import
+_URL_RE = re.compile(r'(?:https?|www)\S+')
+_HASHTAG_RE = re.compile(r'#\w+')
+_MENTION_RE = re.compile(r'@\w+')
+_url_sub = _URL_RE.sub
+_hashtag_sub = _HASHTAG_RE.sub
+_mention_sub = _MENTION_RE.sub
+
+_EMOJI_RE = re.compile("["
+    u"\U0001F600-\U0001F64F"  # emoticons
+    u"\U0001F300-\U0001F5FF"  # symbols & pictographs
+    u"\U0001F680-\U0001F6FF"  # transport & map symbols
+    u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
+    u"\U00002702-\U000027B0"
+    u"\U000024C2-\U0001F251"
+    "]+", flags=re.UNICODE)
+_emoji_sub = _EMOJI_RE.sub
+
+def _env_flag(name, default):
+    return os.getenv(name, default).lower() == 'true'
+
+@dataclass(frozen=True, slots=True)
+class BotConfig:
+    """Bot settings loaded once from environment variables"""
+    telegram_api_id: str
+    telegram_api_hash: str
+    telegram_bot_token: str
+    source_channels: tuple
+    log_channel: int
+    
+    twitter_bearer_token: str
+    twitter_consumer_key: str
+    twitter_consumer_secret: str
+    twitter_access_token: str
+    twitter_access_secret: str
+    
+    # Processing options
+    max_twitter_length: int = 280
+    skip_long_posts: bool = True
+    remove_urls: bool = True
+    remove_hashtags: bool = False
+    remove_mentions: bool = False
+    add_prefix: str = '📢 '
+    add_suffix: str = ''
+    remove_emojis: bool = False
+    trim_extra_spaces: bool = True
+    twitter_max_concurrency: int = 2
+    max_parallel_downloads: int = 4
+
+    @classmethod
+    def from_env(cls):
+        """Build the config from environment variables"""
+        return cls(
+            telegram_api_id=os.getenv('TELEGRAM_API_ID'),
+            telegram_api_hash=os.getenv('TELEGRAM_API_HASH'),
+            telegram_bot_token=os.getenv('TELEGRAM_BOT_TOKEN'),
+            source_channels=tuple(int(x.strip()) for x in os.getenv('SOURCE_CHANNELS', '').split(',') if x.strip()),
+            log_channel=int(os.getenv('LOG_CHANNEL', '0')),
+            
+            twitter_bearer_token=os.getenv('TWITTER_BEARER_TOKEN'),
+            twitter_consumer_key=os.getenv('TWITTER_CONSUMER_KEY'),
+            twitter_consumer_secret=os.getenv('TWITTER_CONSUMER_SECRET'),
+            twitter_access_token=os.getenv('TWITTER_ACCESS_TOKEN'),
+            twitter_access_secret=os.getenv('TWITTER_ACCESS_SECRET'),
+            
+            max_twitter_length=int(os.getenv('MAX_TWITTER_LENGTH', '280')),
+            skip_long_posts=_env_flag('SKIP_LONG_POSTS', 'True'),
+            remove_urls=_env_flag('REMOVE_URLS', 'True'),
+            remove_hashtags=_env_flag('REMOVE_HASHTAGS', 'False'),
+            remove_mentions=_env_flag('REMOVE_MENTIONS', 'False'),
+            add_prefix=os.getenv('ADD_PREFIX', '📢 '),
+            add_suffix=os.getenv('ADD_SUFFIX', ''),
+            remove_emojis=_env_flag('REMOVE_EMOJIS', 'False'),
+            trim_extra_spaces=_env_flag('TRIM_EXTRA_SPACES', 'True'),
+            twitter_max_concurrency=int(os.getenv('TWITTER_MAX_CONCURRENCY', '2')),
+            max_parallel_downloads=int(os.getenv('MAX_PARALLEL_DOWNLOADS', '4'))
+        )
+
 class SmartPostingBot:
     def __init__(self):
         # Load configuration from environment variables
-        self.config = {
-            'TELEGRAM_API_ID': os.getenv('TELEGRAM_API_ID'),
-            'TELEGRAM_API_HASH': os.getenv('TELEGRAM_API_HASH'),
-            'TELEGRAM_BOT_TOKEN': os.getenv('TELEGRAM_BOT_TOKEN'),
-            'SOURCE_CHANNELS': [int(x.strip()) for x in os.getenv('SOURCE_CHANNELS', '').split(',') if x.strip()],
-            'LOG_CHANNEL': int(os.getenv('LOG_CHANNEL')),
-            
-            'TWITTER_BEARER_TOKEN': os.getenv('TWITTER_BEARER_TOKEN'),
-            'TWITTER_CONSUMER_KEY': os.getenv('TWITTER_CONSUMER_KEY'),
-            'TWITTER_CONSUMER_SECRET': os.getenv('TWITTER_CONSUMER_SECRET'),
-            'TWITTER_ACCESS_TOKEN': os.getenv('TWITTER_ACCESS_TOKEN'),
-            'TWITTER_ACCESS_SECRET': os.getenv('TWITTER_ACCESS_SECRET'),
-            
-            # Processing options
-            'MAX_TWITTER_LENGTH': int(os.getenv('MAX_TWITTER_LENGTH', '280')),
-            'SKIP_LONG_POSTS': os.getenv('SKIP_LONG_POSTS', 'True').lower() == 'true',
-            'REMOVE_URLS': os.getenv('REMOVE_URLS', 'True').lower() == 'true',
-            'REMOVE_HASHTAGS': os.getenv('REMOVE_HASHTAGS', 'False').lower() == 'true',
-            'REMOVE_MENTIONS': os.getenv('REMOVE_MENTIONS', 'False').lower() == 'true',
-            'ADD_PREFIX': os.getenv('ADD_PREFIX', '📢 '),
-            'ADD_SUFFIX': os.getenv('ADD_SUFFIX', ''),
-            'REMOVE_EMOJIS': os.getenv('REMOVE_EMOJIS', 'False').lower() == 'true',
-            'TRIM_EXTRA_SPACES': os.getenv('TRIM_EXTRA_SPACES', 'True').lower() == 'true'
-        }
+        self.config = BotConfig.from_env()
         
         # Validate required environment variables
         self.validate_config()
         
-        # Initialize Telegram Client
+        # Specialize text processing to the configured options
+        self._text_pipeline = self.build_text_pipeline()
+        self._is_noop_pipeline = not self._text_pipeline
+        
+        # Initialize Telegram Client; login happens in run() once the
+        # health check server is listening
         self.client = TelegramClient(
             StringSession(), 
-            self.config['TELEGRAM_API_ID'], 
-            self.config['TELEGRAM_API_HASH']
-        ).start(bot_token=self.config['TELEGRAM_BOT_TOKEN'])
+            self.config.telegram_api_id, 
+            self.config.telegram_api_hash
+        )
         
         # Initialize Twitter Client
         self.twitter_client = TwitterClient(
-            bearer_token=self.config['TWITTER_BEARER_TOKEN'],
-            consumer_key=self.config['TWITTER_CONSUMER_KEY'],
-            consumer_secret=self.config['TWITTER_CONSUMER_SECRET'],
-            access_token=self.config['TWITTER_ACCESS_TOKEN'],
-            access_token_secret=self.config['TWITTER_ACCESS_SECRET']
+            bearer_token=self.config.twitter_bearer_token,
+            consumer_key=self.config.twitter_consumer_key,
+            consumer_secret=self.config.twitter_consumer_secret,
+            access_token=self.config.twitter_access_token,
+            access_token_secret=self.config.twitter_access_secret
         )
         
-        # Add handlers for all source channels
-        for channel_id in self.config['SOURCE_CHANNELS']:
-            self.client.add_event_handler(
-                lambda e: self.handle_source_channel_message(e, channel_id),
-                events.NewMessage(chats=channel_id)
-            )
-            logger.info(f"Added handler for channel: {channel_id}")
+        # Media uploads still go through the v1.1 API
+        auth = OAuth1UserHandler(
+            self.config.twitter_consumer_key,
+            self.config.twitter_consumer_secret,
+            self.config.twitter_access_token,
+            self.config.twitter_access_secret
+        )
+        self._legacy_api = API(auth)
+        
+        # Limit concurrent Twitter posts to stay within rate limits
+        self._twitter_sem = asyncio.Semaphore(self.config.twitter_max_concurrency)
+        
+        # Limit parallel Telegram downloads to avoid FLOOD_WAIT errors
+        self._dl_sem = asyncio.Semaphore(self.config.max_parallel_downloads)
+        
+        # Album items waiting to be posted to the log channel, keyed by
+        # (source channel, grouped_id)
+        self._pending_albums = defaultdict(list)
+        self._album_timers = {}
+        self._album_tasks = set()
+        
+        # Add a single handler covering all source channels
+        self.client.add_event_handler(
+            self._dispatch,
+            events.NewMessage(chats=self.config.source_channels)
+        )
+        logger.info(f"Added handler for channels: {self.config.source_channels}")
 
     def validate_config(self):
         """Validate that all required environment variables are set"""
@@ -85,46 +198,58 @@ class SmartPostingBot:
         ]
         
         for var in required_vars:
-            if not self.config.get(var):
+            if not getattr(self.config, var.lower()):
                 raise ValueError(f"Environment variable {var} is required but not set")
+        
+        if self.config.twitter_max_concurrency < 1:
+            raise ValueError("Environment variable TWITTER_MAX_CONCURRENCY must be at least 1")
+        
+        if self.config.max_parallel_downloads < 1:
+            raise ValueError("Environment variable MAX_PARALLEL_DOWNLOADS must be at least 1")
 
-    def process_text(self, text, source_channel=None):
-        """Process text with all configured options"""
-        if not text:
-            return ""
-            
-        processed_text = text
+    def build_text_pipeline(self):
+        """Build the list of text processing steps enabled by the config"""
+        pipeline = []
+        
+        if self.config.remove_urls:
+            pipeline.append(lambda t: _url_sub('', t))
+        
+        if self.config.remove_hashtags:
+            pipeline.append(lambda t: _hashtag_sub('', t))
         
-        if self.config['REMOVE_URLS']:
-            processed_text = re.sub(r'http\S+|www\S+|https\S+', '', processed_text, flags=re.MULTILINE)
+        if self.config.remove_mentions:
+            pipeline.append(lambda t: _mention_sub('', t))
         
-        if self.config['REMOVE_HASHTAGS']:
-            processed_text = re.sub(r'#\w+', '', processed_text)
+        if self.config.remove_emojis:
+            pipeline.append(lambda t: _emoji_sub('', t))
         
-        if self.config['REMOVE_MENTIONS']:
-            processed_text = re.sub(r'@\w+', '', processed_text)
+        if self.config.trim_extra_spaces:
+            pipeline.append(lambda t: ' '.join(t.split()))
         
-        if self.config['REMOVE_EMOJIS']:
-            emoji_pattern = re.compile("["
-                u"\U0001F600-\U0001F64F"  # emoticons
-                u"\U0001F300-\U0001F5FF"  # symbols & pictographs
-                u"\U0001F680-\U0001F6FF"  # transport & map symbols
-                u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
-                u"\U00002702-\U000027B0"
-                u"\U000024C2-\U0001F251"
-                "]+", flags=re.UNICODE)
-            processed_text = emoji_pattern.sub(r'', processed_text)
+        if self.config.add_prefix:
+            pipeline.append(lambda t, p=self.config.add_prefix: p + t)
         
-        if self.config['TRIM_EXTRA_SPACES']:
-            processed_text = re.sub(r'\s+', ' ', processed_text).strip()
+        if self.config.add_suffix:
+            pipeline.append(lambda t, s=self.config.add_suffix: t + s)
         
-        if self.config['ADD_PREFIX']:
-            processed_text = f"{self.config['ADD_PREFIX']}{processed_text}"
+        return pipeline
+
+    def process_text(self, text, source_channel=None):
+        """Process text with all configured options"""
+        if self._is_noop_pipeline:
+            return (text or "").strip()
+        
+        if not text:
+            return ""
         
-        if self.config['ADD_SUFFIX']:
-            processed_text = f"{processed_text}{self.config['ADD_SUFFIX']}"
+        for step in self._text_pipeline:
+            text = step(text)
         
-        return processed_text.strip()
+        return text.strip()
+
+    async def _dispatch(self, event):
+        """Route a new message to the handler with its source channel"""
+        await self.handle_source_channel_message(event, event.chat_id)
 
     async def handle_source_channel_message(self, event, source_channel_id):
         """Handle new messages from source channels"""
@@ -137,46 +262,146 @@ class SmartPostingBot:
             processed_text = self.process_text(text, source_channel_id)
             
             # Check length before Twitter posting
-            if self.config['SKIP_LONG_POSTS'] and len(processed_text) > self.config['MAX_TWITTER_LENGTH']:
+            if self.config.skip_long_posts and len(processed_text) > self.config.max_twitter_length:
                 logger.warning(f"Message too long for Twitter ({len(processed_text)} chars), skipping Twitter post")
                 skip_twitter = True
+            elif message.file and message.file.size and message.file.size > TWITTER_MEDIA_LIMIT:
+                logger.warning(f"Media too large for Twitter ({message.file.size / (1024 * 1024):.2f}MB), skipping Twitter post")
+                skip_twitter = True
             else:
                 skip_twitter = False
             
-            # Post to log channel (always)
-            await self.post_to_log_channel(message, processed_text, source_channel_id)
-            
-            # Post to Twitter only if not skipped
-            if not skip_twitter:
-                await self.process_for_twitter(message, processed_text, source_channel_id)
-            else:
+            if skip_twitter:
                 logger.info("Skipped Twitter posting as per configuration")
+            
+            if message.grouped_id:
+                # Album items go to the log channel together once the burst settles
+                self.queue_album_item(message, processed_text, source_channel_id)
+                if skip_twitter:
+                    return
+            
+            # Download media once and share it between log channel and Twitter
+            media = await self.download_message_media(message)
+            
+            try:
+                # Post to log channel and Twitter (unless skipped) concurrently
+                tasks = []
+                if not message.grouped_id:
+                    tasks.append(self.post_to_log_channel(processed_text, media, source_channel_id))
+                if not skip_twitter:
+                    tasks.append(self.process_for_twitter(processed_text, media, source_channel_id))
+                
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.error(f"Error posting message {message.id}: {result}")
+            finally:
+                # Clean up temp file once both posts are done
+                if isinstance(media, str):
+                    Path(media).unlink(missing_ok=True)
                 
         except Exception as e:
             logger.error(f"Error handling message: {e}")
 
-    async def post_to_log_channel(self, message, processed_text, source_channel_id):
+    def queue_album_item(self, message, processed_text, source_channel_id):
+        """Buffer an album item and (re)start the album's debounce timer"""
+        key = (source_channel_id, message.grouped_id)
+        self._pending_albums[key].append((message, processed_text))
+        
+        # Each new item pushes the flush back until the burst goes quiet
+        timer = self._album_timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        self._album_timers[key] = asyncio.get_running_loop().call_later(
+            ALBUM_DEBOUNCE_SECONDS, self._start_album_flush, key
+        )
+
+    def _start_album_flush(self, key):
+        """Run the album flush as a task, keeping a reference until it is done"""
+        self._album_timers.pop(key, None)
+        task = asyncio.create_task(self.flush_album(key))
+        self._album_tasks.add(task)
+        task.add_done_callback(self._album_tasks.discard)
+
+    async def flush_album(self, key):
+        """Post a buffered album to the log channel in a single call"""
+        items = sorted(self._pending_albums.pop(key, []), key=lambda item: item[0].id)
+        if not items:
+            return
+        
+        source_channel_id = key[0]
+        try:
+            # Re-send the existing media by reference without downloading it.
+            # This fails for forward-protected source chats, which is handled
+            # below by downloading each item instead.
+            await self.client.send_file(
+                self.config.log_channel,
+                file=[message.media for message, _ in items],
+                caption=[text for _, text in items]
+            )
+            logger.info(f"Posted album of {len(items)} items to log channel from {source_channel_id}")
+            return
+            
+        except Exception as e:
+            logger.warning(f"Error posting album to log channel, posting items individually: {e}")
+        
+        for message, processed_text in items:
+            media = None
+            try:
+                media = await self.download_message_media(message)
+                await self.post_to_log_channel(processed_text, media, source_channel_id)
+            except Exception as e:
+                logger.error(f"Error posting album item {message.id} to log channel: {e}")
+            finally:
+                if isinstance(media, str):
+                    Path(media).unlink(missing_ok=True)
+
+    async def download_message_media(self, message):
+        """Download message media into memory if small, otherwise to a temp file"""
+        if not message.media:
+            return None
+        
+        if message.file and message.file.size and message.file.size < IN_MEMORY_MEDIA_LIMIT:
+            buf = io.BytesIO()
+            async with self._dl_sem:
+                await self.client.download_media(message.media, file=buf)
+            if not buf.tell():
+                return None
+            # Telethon and Tweepy infer the media type from the file name
+            buf.name = f"media_{message.id}{message.file.ext or ''}"
+            buf.seek(0)
+            return buf
+        
+        # Unique temp file so concurrent downloads from different channels
+        # with the same message id cannot clobber each other
+        ext = (message.file and message.file.ext) or ''
+        with tempfile.NamedTemporaryFile(prefix=f"media_{message.id}_", suffix=ext, delete=False) as tmp:
+            try:
+                async with self._dl_sem:
+                    await self.client.download_media(message.media, file=tmp)
+            except Exception:
+                tmp.close()
+                Path(tmp.name).unlink(missing_ok=True)
+                raise
+            if not tmp.tell():
+                tmp.close()
+                Path(tmp.name).unlink(missing_ok=True)
+                return None
+        return tmp.name
+
+    async def post_to_log_channel(self, processed_text, media, source_channel_id):
         """Post to log channel without forward tag"""
         try:
-            if message.media:
-                # Download and re-upload media
-                media_path = await self.client.download_media(
-                    message.media,
-                    file=f"temp_media_{message.id}"
-                )
-                
+            if media:
+                # Re-upload downloaded media
                 await self.client.send_file(
-                    self.config['LOG_CHANNEL'],
-                    file=media_path,
+                    self.config.log_channel,
+                    file=media,
                     caption=processed_text
                 )
-                
-                # Clean up temp file
-                if os.path.exists(media_path):
-                    os.remove(media_path)
             else:
                 await self.client.send_message(
-                    self.config['LOG_CHANNEL'],
+                    self.config.log_channel,
                     processed_text
                 )
                 
@@ -185,20 +410,11 @@ class SmartPostingBot:
         except Exception as e:
             logger.error(f"Error posting to log channel: {e}")
 
-    async def process_for_twitter(self, message, processed_text, source_channel_id):
+    async def process_for_twitter(self, processed_text, media, source_channel_id):
         """Process message for Twitter posting"""
         try:
-            media_path = None
-            
-            if message.media:
-                logger.info("Downloading media for Twitter...")
-                media_path = await self.client.download_media(
-                    message.media,
-                    file=f"twitter_media_{message.id}"
-                )
-            
             logger.info("Posting to Twitter...")
-            success = self.post_to_twitter(processed_text, media_path)
+            success = await self.post_to_twitter(processed_text, media)
             
             if success:
                 logger.info(f"Successfully posted to Twitter from {source_channel_id}")
@@ -207,43 +423,57 @@ class SmartPostingBot:
                 
         except Exception as e:
             logger.error(f"Error processing for Twitter: {e}")
-        finally:
-            if media_path and os.path.exists(media_path):
-                os.remove(media_path)
 
-    def post_to_twitter(self, text, media_path=None):
+    async def call_twitter(self, func, *args, **kwargs):
+        """Run a blocking Tweepy call in a thread, retrying it on rate limits"""
+        for attempt in range(TWITTER_MAX_RETRIES + 1):
+            try:
+                # Tweepy is blocking, so keep it off the event loop
+                async with self._twitter_sem:
+                    return await asyncio.to_thread(func, *args, **kwargs)
+            except TooManyRequests:
+                if attempt == TWITTER_MAX_RETRIES:
+                    raise
+                # Back off without holding a concurrency slot
+                delay = TWITTER_RETRY_BASE_DELAY * 2 ** attempt
+                logger.warning(f"Twitter rate limit hit, retrying in {delay}s")
+                await asyncio.sleep(delay)
+
+    def upload_media_to_twitter(self, media):
+        """Upload media using v1.1 API"""
+        if isinstance(media, str):
+            return self._legacy_api.media_upload(media)
+        # Upload from a private copy so the log channel upload can share the buffer
+        return self._legacy_api.media_upload(media.name, file=io.BytesIO(media.getvalue()))
+
+    async def post_to_twitter(self, text, media=None):
         """Post to Twitter using API v2"""
         try:
-            if media_path:
-                # Check media size
-                file_size = os.path.getsize(media_path) / (1024 * 1024)
-                if file_size > 50:
-                    logger.warning(f"Media file too large ({file_size:.2f}MB)")
-                    raise ValueError("Media file exceeds 50MB limit")
-                
-                # Upload media using v1.1 API
-                from tweepy import OAuth1UserHandler, API
-                auth = OAuth1UserHandler(
-                    self.config['TWITTER_CONSUMER_KEY'],
-                    self.config['TWITTER_CONSUMER_SECRET'],
-                    self.config['TWITTER_ACCESS_TOKEN'],
-                    self.config['TWITTER_ACCESS_SECRET']
-                )
-                legacy_api = API(auth)
-                media = legacy_api.media_upload(media_path)
-                
-                # Post with media using v2 API
-                response = self.twitter_client.create_tweet(
-                    text=text,
-                    media_ids=[media.media_id]
-                )
-            else:
-                # Text-only tweet
-                response = self.twitter_client.create_tweet(text=text)
+            media_ids = None
+            if media:
+                if isinstance(media, str):
+                    # Check media size
+                    file_size = os.stat(media).st_size
+                    if file_size > TWITTER_MEDIA_LIMIT:
+                        logger.warning(f"Media file too large ({file_size / (1024 * 1024):.2f}MB)")
+                        raise ValueError("Media file exceeds 50MB limit")
                 
+                # Upload once; a rate limited tweet is retried without re-uploading
+                uploaded = await self.call_twitter(self.upload_media_to_twitter, media)
+                media_ids = [uploaded.media_id]
+            
+            response = await self.call_twitter(
+                self.twitter_client.create_tweet,
+                text=text,
+                media_ids=media_ids
+            )
+            
             logger.info(f"Tweet posted! ID: {response.data['id']}")
             return True
             
+        except TooManyRequests as e:
+            logger.error(f"Twitter rate limit exceeded, giving up: {e}")
+            return False
         except TweepyException as e:
             logger.error(f"Twitter API error: {e}")
             return False
@@ -251,35 +481,51 @@ class SmartPostingBot:
             logger.error(f"Unexpected error: {e}")
             return False
 
+    async def handle_health_check(self, reader, writer):
+        """Answer a health check probe"""
+        try:
+            # Drain the request line and headers, dropping idle connections
+            while (await asyncio.wait_for(reader.readline(), HEALTH_CHECK_TIMEOUT)).strip():
+                pass
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Length: 14\r\n"
+                b"Connection: close\r\n"
+                b"\r\n"
+                b"Bot is running"
+            )
+            await writer.drain()
+        except asyncio.TimeoutError:
+            pass
+        except Exception as e:
+            logger.error(f"Error answering health check: {e}")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
     def run(self):
         """Run the bot"""
         logger.info("Starting Smart Posting Bot...")
-        logger.info(f"Monitoring {len(self.config['SOURCE_CHANNELS'])} source channels")
-        logger.info(f"Log channel: {self.config['LOG_CHANNEL']}")
-        logger.info(f"Max Twitter length: {self.config['MAX_TWITTER_LENGTH']}")
-        logger.info(f"Skip long posts: {self.config['SKIP_LONG_POSTS']}")
+        
+        # Serve health checks from the same event loop as the Telegram client,
+        # before logging in so probes succeed during login and FLOOD_WAIT
+        self._health_server = self.client.loop.run_until_complete(
+            asyncio.start_server(self.handle_health_check, '0.0.0.0', HEALTH_CHECK_PORT)
+        )
+        logger.info(f"Health check server listening on port {HEALTH_CHECK_PORT}")
+        
+        self.client.start(bot_token=self.config.telegram_bot_token)
+        
+        logger.info(f"Monitoring {len(self.config.source_channels)} source channels")
+        logger.info(f"Log channel: {self.config.log_channel}")
+        logger.info(f"Max Twitter length: {self.config.max_twitter_length}")
+        logger.info(f"Skip long posts: {self.config.skip_long_posts}")
         self.client.run_until_disconnected()
 
 if __name__ == "__main__":
-    import os
-    import threading
-    from http.server import HTTPServer, BaseHTTPRequestHandler
-    
-    # Simple health check server
-    class HealthHandler(BaseHTTPRequestHandler):
-        def do_GET(self):
-            self.send_response(200)
-            self.end_headers()
-            self.wfile.write(b"Bot is running")
-    
-    def run_health_server():
-        server = HTTPServer(('0.0.0.0', 8000), HealthHandler)
-        server.serve_forever()
-    
-    # Start health server in background
-    health_thread = threading.Thread(target=run_health_server, daemon=True)
-    health_thread.start()
-    
     # Start the bot
     bot = SmartPostingBot()
     bot.run()